@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import yt_sync  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Point yt_sync at a throwaway data.json / downloads dir and reset its state."""
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    monkeypatch.setattr(yt_sync, "DATA_FILE", tmp_path / "data.json")
+    monkeypatch.setattr(yt_sync, "DOWNLOAD_DIR", downloads)
+    yt_sync.play_times.clear()
+    yt_sync.jobs.clear()
+    yt_sync.workers.clear()
+    yt_sync.head_cache.clear()
+    for key, value in yt_sync.cache_stats.items():
+        if isinstance(value, int):
+            yt_sync.cache_stats[key] = 0
+        else:
+            value.clear()
+    while not yt_sync.job_queue.empty():
+        yt_sync.job_queue.get_nowait()
+        yt_sync.job_queue.task_done()
+    return downloads
+
+
+def make_video(downloads, pl_id, vid_id, size=1000, **extra):
+    d = downloads / pl_id
+    d.mkdir(exist_ok=True)
+    f = d / f"T [{vid_id}].mp3"
+    f.write_bytes(b"x" * size)
+    return dict({"id": vid_id, "title": vid_id, "downloaded": True,
+                 "file_path": str(f)}, **extra)
+
+
+@pytest.fixture
+def server(store):
+    """Run the HTTP handler on a free port; yields a request helper."""
+    import json
+    import threading
+    import urllib.error
+    import urllib.request
+
+    httpd = yt_sync.ThreadingHTTPServer(("127.0.0.1", 0), yt_sync.Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    def request(path, body=None, headers=None):
+        data = None if body is None else json.dumps(body).encode("utf-8")
+        req  = urllib.request.Request(base + path, data=data, headers=headers or {})
+        try:
+            with urllib.request.urlopen(req, timeout=5) as r:
+                return r.status, r.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    yield request
+    httpd.shutdown()
+    httpd.server_close()
@@ -0,0 +1,90 @@
+import json
+
+import yt_sync
+
+
+def test_prefetch_rejects_non_string_ids(server):
+    assert server("/api/prefetch", {"playlist_id": "p", "video_ids": [{"a": 1}]})[0] == 400
+    assert server("/api/prefetch", {"playlist_id": {"a": 1}, "video_ids": []})[0] == 400
+    status, body = server("/api/prefetch", {"playlist_id": "p", "video_ids": ["v0"]})
+    assert status == 200 and json.loads(body) == {"warming": 0}
+
+
+def test_gap_rejects_non_finite_and_negative(server):
+    for bad in ("nan", "inf", -5, None, True):
+        assert server("/api/prefetch/gap", {"ms": bad})[0] == 400
+    assert server("/api/prefetch/gap", {"ms": 42})[0] == 200
+    status, body = server("/api/prefetch/stats")
+    assert json.loads(body)["gap_ms"] == 42.0
+
+
+HEAD = 1000
+
+
+def _media(store, monkeypatch, n=1, size=3000):
+    monkeypatch.setattr(yt_sync, "READAHEAD_BYTES", HEAD)
+    videos, blobs = [], []
+    for i in range(n):
+        blob = bytes((i * 7 + j) % 251 for j in range(size))
+        f = store / f"T [v{i}].mp3"
+        f.write_bytes(blob)
+        videos.append({"id": f"v{i}", "downloaded": True, "file_path": str(f)})
+        blobs.append(blob)
+    yt_sync.save_data({"settings": {}, "playlists": {
+        "p": {"id": "p", "title": "p", "videos": videos}}})
+    return [store / f"T [v{i}].mp3" for i in range(n)], blobs
+
+
+def _get(server, vid, rng=None):
+    headers = {"Range": f"bytes={rng}"} if rng else {}
+    return server(f"/api/stream/p/{vid}", headers=headers)
+
+
+def test_ranges_around_cached_head_return_file_bytes(server, store, monkeypatch):
+    (f,), (blob,) = _media(store, monkeypatch)
+    yt_sync.warm_file(f)
+    assert yt_sync.cached_head(f, f.stat()) == blob[:HEAD]
+
+    assert _get(server, "v0") == (200, blob)
+    for rng, want in [("0-99", blob[:100]),                   # inside the head
+                      ("500-1499", blob[500:1500]),           # crosses its end
+                      ("999-1000", blob[999:1001]),
+                      ("1000-", blob[1000:]),                 # starts at its end
+                      ("2500-", blob[2500:]),                 # past it
+                      ("-", blob)]:
+        assert _get(server, "v0", rng) == (206, want), rng
+
+
+def test_stale_cache_entry_is_ignored(server, store, monkeypatch):
+    (f,), _ = _media(store, monkeypatch)
+    yt_sync.warm_file(f)
+    new = b"n" * 2000
+    f.write_bytes(new)
+    assert yt_sync.cached_head(f, f.stat()) is None
+    assert _get(server, "v0") == (200, new)
+    assert _get(server, "v0", "900-1099") == (206, new[900:1100])
+
+
+def test_warm_file_keeps_lru_bound(store, monkeypatch):
+    monkeypatch.setattr(yt_sync, "READAHEAD_MAX_FILES", 2)
+    files, _ = _media(store, monkeypatch, n=3)
+    yt_sync.warm_file(files[0])
+    yt_sync.warm_file(files[1])
+    yt_sync.warm_file(files[0])          # refresh: files[1] is now the oldest
+    yt_sync.warm_file(files[2])
+    assert list(yt_sync.head_cache) == [str(files[0]), str(files[2])]
+    assert yt_sync.cache_stats["warmed"] == 3
+
+
+def test_report_counts_hits_and_misses_on_track_starts(server, store, monkeypatch):
+    files, _ = _media(store, monkeypatch, n=2)
+    yt_sync.warm_file(files[0])
+    _get(server, "v0")                   # hit
+    _get(server, "v0", "0-10")           # hit
+    _get(server, "v1")                   # miss
+    _get(server, "v1", "2000-")          # not a track start: not counted
+    report = yt_sync.readahead_report()
+    assert (report["hits"], report["misses"]) == (2, 1)
+    assert report["hit_rate"] == round(2 / 3, 3)
+    assert report["ttfb_hit_ms"] is not None and report["ttfb_miss_ms"] is not None
+    assert report["cached_files"] == 1 and report["cached_bytes"] == HEAD
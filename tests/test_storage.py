@@ -0,0 +1,124 @@
+import json
+from collections import namedtuple
+from pathlib import Path
+
+import yt_sync
+from conftest import make_video
+
+Usage = namedtuple("Usage", "total used free")
+
+
+def _data(downloads):
+    return {"settings": {}, "playlists": {
+        "a": {"id": "a", "title": "a", "videos": [
+            make_video(downloads, "a", "old", last_played=100),
+            make_video(downloads, "a", "new", last_played=300),
+            make_video(downloads, "a", "mid", downloaded_at=200),
+        ]},
+        "b": {"id": "b", "title": "b", "pinned": True, "videos": [
+            make_video(downloads, "b", "pinned", last_played=1),
+        ]},
+    }}
+
+
+def test_evict_lru_removes_least_recently_played_first(store):
+    data = _data(store)
+    evicted, freed = yt_sync.evict_lru(data, 1500)
+    assert [e["video_id"] for e in evicted] == ["old", "mid"]
+    assert freed == 2000
+    a = {v["id"]: v for v in data["playlists"]["a"]["videos"]}
+    assert a["old"]["file_path"] is None and not a["old"]["downloaded"]
+    assert a["new"]["downloaded"]
+
+
+def test_evict_lru_skips_pinned_playlists(store):
+    data = _data(store)
+    evicted, _ = yt_sync.evict_lru(data, 10 ** 9)
+    assert {e["playlist_id"] for e in evicted} == {"a"}
+    pinned = data["playlists"]["b"]["videos"][0]
+    assert pinned["downloaded"] and Path(pinned["file_path"]).exists()
+
+
+def test_delete_video_file_removes_info_json(store):
+    v = make_video(store, "a", "x")
+    info = Path(v["file_path"]).with_suffix(".info.json")
+    info.write_text("{}")
+    assert yt_sync._delete_video_file(v) == 1002
+    assert not info.exists() and v["file_path"] is None
+
+
+def test_failed_delete_keeps_entry(store, monkeypatch):
+    data = _data(store)
+
+    def locked(self, *a, **kw):
+        raise PermissionError("in use")
+    monkeypatch.setattr(Path, "unlink", locked)
+    evicted, freed = yt_sync.evict_lru(data, 10 ** 9)
+    assert evicted == [] and freed == 0
+    assert all(v["downloaded"] for v in data["playlists"]["a"]["videos"])
+
+
+def test_low_disk_does_not_evict_without_quota(store, monkeypatch):
+    yt_sync.save_data(_data(store))
+    monkeypatch.setattr(yt_sync.shutil, "disk_usage",
+                        lambda p: Usage(10 * yt_sync.GB, 0, 500 * 1024 ** 2))
+    assert yt_sync.enforce_quota() == []
+    assert not yt_sync.has_free_space()
+    videos = yt_sync.load_data()["playlists"]["a"]["videos"]
+    assert all(v["downloaded"] for v in videos)
+
+
+def test_quota_evicts_down_to_limit(store):
+    data = _data(store)
+    data["settings"] = {"quota_gb": 2500 / yt_sync.GB, "min_free_gb": 0}
+    yt_sync.save_data(data)
+    evicted = yt_sync.enforce_quota()
+    assert [e["video_id"] for e in evicted] == ["old", "mid"]
+
+
+def test_played_times_are_flushed_to_data(store):
+    yt_sync.save_data(_data(store))
+    yt_sync.touch_played("a", "old")
+    assert yt_sync.flush_play_times() == 1
+    old = yt_sync.load_data()["playlists"]["a"]["videos"][0]
+    assert old["last_played"] > 300
+
+
+def test_settings_update_rejects_bad_storage_values(server):
+    assert server("/api/settings/update", {"quota_gb": "abc"})[0] == 400
+    assert server("/api/settings/update", {"min_free_gb": -1})[0] == 400
+    assert server("/api/settings/update", {"quota_gb": "nan"})[0] == 400
+    assert server("/api/settings/update", {"evict_when_low": "yes"})[0] == 400
+    status, _ = server("/api/settings/update", {"quota_gb": "2.5", "evict_when_low": True})
+    assert status == 200
+    assert yt_sync.load_data()["settings"]["quota_gb"] == 2.5
+
+
+def test_junk_saved_settings_fall_back_to_defaults(store):
+    yt_sync.save_data({"settings": {"quota_gb": "abc", "min_free_gb": "x"},
+                       "playlists": {}})
+    quota, min_free = yt_sync._storage_settings(yt_sync.load_data())
+    assert quota == yt_sync.DEFAULT_QUOTA_GB * yt_sync.GB
+    assert min_free == yt_sync.DEFAULT_MIN_FREE_GB * yt_sync.GB
+    assert yt_sync.enforce_quota() == []
+
+
+def test_dry_run_previews_without_deleting(store):
+    yt_sync.save_data(_data(store))
+    preview = yt_sync.enforce_quota(dry_run=True,
+                                    settings={"quota_gb": 2500 / yt_sync.GB, "min_free_gb": 0})
+    assert [e["video_id"] for e in preview] == ["old", "mid"]
+    data = yt_sync.load_data()
+    assert "quota_gb" not in data["settings"]
+    assert all(Path(v["file_path"]).exists() for v in data["playlists"]["a"]["videos"])
+
+
+def test_enforce_endpoint_preview_and_apply(server):
+    yt_sync.save_data(_data(yt_sync.DOWNLOAD_DIR))
+    proposed = {"quota_gb": 2500 / yt_sync.GB, "min_free_gb": 0}
+    status, body = server("/api/storage/enforce", {"dry_run": True, "settings": proposed})
+    assert status == 200 and json.loads(body)["freed"] == 2000
+    assert server("/api/storage/enforce", {"settings": proposed})[0] == 400
+    assert server("/api/settings/update", proposed)[0] == 200
+    status, body = server("/api/storage/enforce", {})
+    assert [e["video_id"] for e in json.loads(body)["evicted"]] == ["old", "mid"]
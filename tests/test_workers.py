@@ -0,0 +1,124 @@
+import json
+
+import yt_sync
+
+
+def _queue_job(pl_id="p", vid="v0"):
+    return yt_sync.add_job(pl_id, vid, vid, "best", True)
+
+
+def _lease(monkeypatch, worker_id):
+    monkeypatch.setattr(yt_sync, "has_free_space", lambda: True)
+    return yt_sync.lease_job(worker_id)
+
+
+def _setup(store):
+    yt_sync.save_data({"settings": {}, "playlists": {
+        "p": {"id": "p", "title": "p", "videos": []}}})
+
+
+def test_lease_hands_out_job_with_running_lease(store, monkeypatch):
+    _setup(store)
+    w = yt_sync.register_worker("w1", 1)
+    job_id = _queue_job()
+    job = _lease(monkeypatch, w["id"])
+    assert job["id"] == job_id and job["playlist_id"] == "p"
+    j = yt_sync.jobs[job_id]
+    assert j["status"] == "running" and j["worker"] == w["id"]
+    assert j["lease_expires"] > yt_sync.time.time()
+    assert _lease(monkeypatch, w["id"]) is None
+
+
+def test_claim_sets_lease_before_prepare(store, monkeypatch):
+    _setup(store)
+    job_id = _queue_job()
+    yt_sync.job_queue.get_nowait()
+    assert yt_sync._claim_job(job_id, "w1")
+    assert yt_sync.expire_leases() == []
+
+
+def test_heartbeat_renews_and_reports_lost_jobs(store, monkeypatch):
+    _setup(store)
+    w1 = yt_sync.register_worker("w1", 1)
+    w2 = yt_sync.register_worker("w2", 1)
+    job_id = _queue_job()
+    _lease(monkeypatch, w1["id"])
+
+    lost = yt_sync.worker_heartbeat(w1["id"], [{"id": job_id, "progress": 42.0}])
+    assert lost == []
+    assert yt_sync.jobs[job_id]["progress"] == 42.0
+
+    assert yt_sync.worker_heartbeat(w2["id"], [{"id": job_id}]) == [job_id]
+    assert yt_sync.worker_heartbeat(w1["id"], [{"id": "gone"}]) == ["gone"]
+    assert yt_sync.worker_heartbeat("nobody", []) is None
+
+
+def test_expired_lease_is_requeued(store, monkeypatch):
+    _setup(store)
+    w = yt_sync.register_worker("w1", 1)
+    job_id = _queue_job()
+    _lease(monkeypatch, w["id"])
+    assert yt_sync.expire_leases() == []
+
+    now = yt_sync.time.time()
+    monkeypatch.setattr(yt_sync.time, "time", lambda: now + yt_sync.LEASE_SECONDS + 1)
+    assert yt_sync.expire_leases() == [job_id]
+    j = yt_sync.jobs[job_id]
+    assert j["status"] == "queued" and j["worker"] is None
+    assert not yt_sync.workers[w["id"]]["alive"]
+    assert yt_sync.job_queue.get_nowait() == job_id
+
+    # The dead worker's late heartbeat is told it lost the job
+    assert yt_sync.worker_heartbeat(w["id"], [{"id": job_id}]) == [job_id]
+
+
+def test_complete_records_download(store, monkeypatch):
+    _setup(store)
+    data = yt_sync.load_data()
+    data["playlists"]["p"]["videos"].append({"id": "v0", "downloaded": False, "file_path": None})
+    yt_sync.save_data(data)
+    w = yt_sync.register_worker("w1", 1)
+    job_id = _queue_job()
+    _lease(monkeypatch, w["id"])
+    f = store / "p" / "T [v0].mp3"
+    f.write_bytes(b"x")
+
+    assert not yt_sync.complete_remote_job("other", job_id, True, f.name, None)
+    assert yt_sync.complete_remote_job(w["id"], job_id, True, f.name, None)
+    assert yt_sync.jobs[job_id]["status"] == "done"
+    v = yt_sync.load_data()["playlists"]["p"]["videos"][0]
+    assert v["downloaded"] and v["file_path"] == str(f)
+
+
+def test_complete_fails_when_file_is_missing_on_coordinator(store, monkeypatch):
+    _setup(store)
+    w = yt_sync.register_worker("w1", 1)
+    job_id = _queue_job()
+    _lease(monkeypatch, w["id"])
+    # e.g. a --shared-storage worker that wrote to its own disk instead
+    assert yt_sync.complete_remote_job(w["id"], job_id, True, "T [v0].mp3", None)
+    j = yt_sync.jobs[job_id]
+    assert j["status"] == "error" and "not found" in j["error"]
+
+
+def test_complete_ignores_directories_in_reported_name(store, monkeypatch):
+    _setup(store)
+    w = yt_sync.register_worker("w1", 1)
+    job_id = _queue_job()
+    _lease(monkeypatch, w["id"])
+    secret = store.parent / "secret.mp3"
+    secret.write_bytes(b"x")
+    assert yt_sync.complete_remote_job(w["id"], job_id, True, "../../secret.mp3", None)
+    assert yt_sync.jobs[job_id]["status"] == "error"
+
+
+def test_worker_endpoints_reject_bad_input(server):
+    assert server("/api/workers/register", {"threads": "x"})[0] == 400
+    assert server("/api/workers/register", {"threads": 0})[0] == 400
+    assert server("/api/workers/lease", {"worker_id": {"a": 1}})[0] == 400
+    status, body = server("/api/workers/register", {"name": "w", "threads": 2})
+    worker_id = json.loads(body)["id"]
+    assert server("/api/workers/heartbeat", {"worker_id": worker_id, "jobs": [1]})[0] == 400
+    assert server("/api/workers/heartbeat", {"worker_id": worker_id, "jobs": "x"})[0] == 400
+    assert server("/api/workers/complete", {"worker_id": worker_id, "job_id": [1]})[0] == 400
+    assert server("/api/workers/heartbeat", {"worker_id": worker_id, "jobs": []})[0] == 200
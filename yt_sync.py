@@ -2,23 +2,30 @@
 """
 YT-Sync: Local YouTube Playlist Manager + Player
 Run: python yt_sync.py [--port 8080] [--threads 3]
+Worker: python yt_sync.py --worker http://coordinator:8080 [--threads 3] [--shared-storage DIR]
 Manager: http://localhost:8080
 Player:  http://localhost:8080/player
 """
 
 import json
+import math
 import mimetypes
+import os
 import queue
 import re
 import shutil
+import socket
 import subprocess
+import tempfile
 import threading
 import time
 import uuid
 import argparse
+from collections import OrderedDict, deque
 from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlencode
+import urllib.error
 import urllib.request
 
 # ─── Config ───────────────────────────────────────────────────────────────────
@@ -47,8 +54,20 @@ def load_data():
     return {"playlists": {}, "settings": {"download_dir": str(DOWNLOAD_DIR), "threads": DEFAULT_THREADS}}
 
 def save_data(data):
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
+    # Write-then-rename so concurrent readers never see a half-written file
+    tmp = DATA_FILE.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2)
+    # On Windows the rename fails while another thread has data.json open for
+    # reading; those readers are brief, so retry instead of losing the write.
+    for attempt in range(50):
+        try:
+            tmp.replace(DATA_FILE)
+            return
+        except PermissionError:
+            if attempt == 49:
+                raise
+            time.sleep(0.02)
 
 # ─── yt-dlp helpers ───────────────────────────────────────────────────────────
 
@@ -115,11 +134,222 @@ def parse_line(line):
                 "speed": m.group(3).strip(), "eta": m.group(4).strip()}
     return None
 
+# ─── Storage Manager ──────────────────────────────────────────────────────────
+
+GB = 1024 ** 3
+DEFAULT_QUOTA_GB    = 0      # 0 = unlimited
+DEFAULT_MIN_FREE_GB = 1.0    # headroom required before a download starts
+PLAY_FLUSH_INTERVAL = 60     # seconds between last-played writes to data.json
+
+# Stream hits arrive once per Range request, so last-played times are kept in
+# memory and written to data.json in batches instead of on every hit.
+play_times = {}
+play_lock  = threading.Lock()
+
+def touch_played(pl_id, vid_id):
+    with play_lock:
+        play_times[(pl_id, vid_id)] = time.time()
+
+def flush_play_times():
+    with play_lock:
+        pending = dict(play_times)
+        play_times.clear()
+    if not pending:
+        return 0
+    with data_lock:
+        data = load_data()
+        for (pl_id, vid_id), ts in pending.items():
+            pl = data["playlists"].get(pl_id)
+            if not pl:
+                continue
+            for v in pl["videos"]:
+                if v["id"] == vid_id:
+                    v["last_played"] = max(ts, v.get("last_played") or 0)
+                    break
+        save_data(data)
+    return len(pending)
+
+def _storage_loop():
+    while True:
+        time.sleep(PLAY_FLUSH_INTERVAL)
+        try:
+            flush_play_times()
+        except Exception as e:
+            print(f"[Storage] Failed to flush play times: {e}")
+
+def start_storage_manager():
+    threading.Thread(target=_storage_loop, daemon=True).start()
+
+def _gb_setting(value):
+    """Parse a GB setting; None unless it is a finite, non-negative number."""
+    if isinstance(value, bool):
+        return None
+    try:
+        gb = float(value or 0)
+    except (TypeError, ValueError):
+        return None
+    return gb if math.isfinite(gb) and gb >= 0 else None
+
+def validate_storage_settings(body):
+    """Coerce storage keys of a settings update in place; returns an error or None."""
+    for key in ("quota_gb", "min_free_gb"):
+        if key in body:
+            gb = _gb_setting(body[key])
+            if gb is None:
+                return f"{key} must be a non-negative number"
+            body[key] = gb
+    if "evict_when_low" in body:
+        if not isinstance(body["evict_when_low"], bool):
+            return "evict_when_low must be true or false"
+    return None
+
+def _storage_settings(data):
+    # Values saved before validation existed may be junk: fall back to defaults
+    s        = data.get("settings", {})
+    quota    = _gb_setting(s.get("quota_gb", DEFAULT_QUOTA_GB))
+    min_free = _gb_setting(s.get("min_free_gb", DEFAULT_MIN_FREE_GB))
+    return ((DEFAULT_QUOTA_GB if quota is None else quota) * GB,
+            (DEFAULT_MIN_FREE_GB if min_free is None else min_free) * GB)
+
+def _may_evict_for_space(data):
+    """Low disk space only deletes media once the user has opted into eviction."""
+    quota, _ = _storage_settings(data)
+    return bool(quota) or data.get("settings", {}).get("evict_when_low") is True
+
+def _file_size(v):
+    fp = v.get("file_path")
+    if not fp:
+        return 0
+    try:
+        return Path(fp).stat().st_size
+    except OSError:
+        return 0
+
+def _delete_video_file(v):
+    """
+    Remove a video's media file (and yt-dlp's .info.json) and clear its
+    download fields. Returns bytes freed, or None if the file could not be
+    deleted (e.g. it is open for streaming on Windows) and is still tracked.
+    """
+    fpath = Path(v["file_path"])
+    freed = 0
+    try:
+        if fpath.exists():
+            size = fpath.stat().st_size
+            fpath.unlink()
+            freed = size
+    except OSError:
+        return None
+    info = fpath.with_suffix(".info.json")
+    try:
+        if info.exists():
+            freed += info.stat().st_size
+            info.unlink()
+    except OSError:
+        pass
+    v["downloaded"] = False
+    v["file_path"]  = None
+    v.pop("quality", None)
+    v.pop("audio_only", None)
+    v.pop("downloaded_at", None)
+    return freed
+
+def storage_report(data):
+    quota, min_free = _storage_settings(data)
+    playlists, used = [], 0
+    for pl in data["playlists"].values():
+        files = []
+        for v in pl["videos"]:
+            size = _file_size(v)
+            if size:
+                files.append({"id": v["id"], "title": v.get("title", v["id"]),
+                              "bytes": size, "last_played": v.get("last_played"),
+                              "downloaded_at": v.get("downloaded_at")})
+        total = sum(f["bytes"] for f in files)
+        used += total
+        playlists.append({"id": pl["id"], "title": pl.get("title", pl["id"]),
+                          "pinned": bool(pl.get("pinned")), "bytes": total,
+                          "files": files})
+    disk = shutil.disk_usage(DOWNLOAD_DIR)
+    return {"used_bytes": used, "quota_bytes": int(quota),
+            "min_free_bytes": int(min_free), "disk_free_bytes": disk.free,
+            "disk_total_bytes": disk.total, "playlists": playlists}
+
+def evict_lru(data, bytes_needed, dry_run=False):
+    """
+    Delete least-recently-played media from unpinned playlists until at least
+    `bytes_needed` bytes are freed. Mutates `data`; caller saves it once.
+    With dry_run nothing is touched and the would-be evictions are returned.
+    """
+    candidates = []
+    for pl in data["playlists"].values():
+        if pl.get("pinned"):
+            continue
+        for v in pl["videos"]:
+            size = _file_size(v)
+            if size:
+                last = max(v.get("last_played") or 0, v.get("downloaded_at") or 0)
+                candidates.append((last, size, pl["id"], v))
+    candidates.sort(key=lambda c: c[0])
+
+    evicted, freed = [], 0
+    for _, size, pl_id, v in candidates:
+        if freed >= bytes_needed:
+            break
+        removed = size if dry_run else _delete_video_file(v)
+        if removed is None:
+            continue
+        freed += removed
+        evicted.append({"playlist_id": pl_id, "video_id": v["id"], "bytes": removed})
+    return evicted, freed
+
+def enforce_quota(extra_bytes=0, dry_run=False, settings=None):
+    """
+    Evict LRU media so usage + `extra_bytes` fits the quota and, if eviction
+    is enabled, the disk keeps `min_free_gb` of headroom. Returns the list of
+    evicted files. dry_run previews the evictions, optionally for proposed
+    `settings` that have not been saved yet.
+    """
+    flush_play_times()
+    with data_lock:
+        data = load_data()
+        if settings:
+            data.setdefault("settings", {}).update(settings)
+        quota, min_free = _storage_settings(data)
+        report = storage_report(data)
+        need   = 0
+        if quota:
+            need = max(need, report["used_bytes"] + extra_bytes - quota)
+        if _may_evict_for_space(data):
+            need = max(need, min_free + extra_bytes - report["disk_free_bytes"])
+        if need <= 0:
+            return []
+        evicted, freed = evict_lru(data, need, dry_run)
+        if dry_run:
+            return evicted
+        if evicted:
+            save_data(data)
+    if evicted:
+        print(f"[Storage] Evicted {len(evicted)} file(s), freed {freed / GB:.2f} GB")
+    return evicted
+
+def has_free_space():
+    """Make room for a new download if possible; False if the disk is still too full."""
+    data = load_data()
+    _, min_free = _storage_settings(data)
+    if shutil.disk_usage(DOWNLOAD_DIR).free >= min_free:
+        return True
+    if not _may_evict_for_space(data):
+        return False
+    enforce_quota()
+    return shutil.disk_usage(DOWNLOAD_DIR).free >= min_free
+
 # ─── Thread-pool Job Queue ────────────────────────────────────────────────────
 
 jobs      = {}
 jobs_lock = threading.Lock()
 job_queue = queue.Queue()
+job_procs = {}   # job_id -> running yt-dlp process, so a lost lease can kill it
 
 def _worker():
     while True:
@@ -127,11 +357,7 @@ def _worker():
         try:
             _run_job(job_id)
         except Exception as e:
-            with jobs_lock:
-                if job_id in jobs:
-                    jobs[job_id]["status"]   = "error"
-                    jobs[job_id]["error"]    = str(e)
-                    jobs[job_id]["finished"] = time.time()
+            _fail_job(job_id, str(e))
         finally:
             job_queue.task_done()
 
@@ -146,6 +372,13 @@ def _update_queue_positions():
             j["queue_pos"] = pos
             pos += 1
 
+def _fail_job(job_id, error):
+    with jobs_lock:
+        if job_id in jobs:
+            jobs[job_id]["status"]   = "error"
+            jobs[job_id]["error"]    = error
+            jobs[job_id]["finished"] = time.time()
+
 def add_job(playlist_id, video_id, title, quality, audio_only):
     job_id = str(uuid.uuid4())[:8]
     with jobs_lock:
@@ -157,30 +390,59 @@ def add_job(playlist_id, video_id, title, quality, audio_only):
             "progress": 0.0, "speed": "", "eta": "", "size": "",
             "phase": "queued", "log": [],
             "started": None, "finished": None, "file": None, "error": None,
+            "worker": None, "lease_expires": None,
         }
         _update_queue_positions()
     job_queue.put(job_id)
     return job_id
 
-def _run_job(job_id):
+def _claim_job(job_id, worker_id=None):
+    """Move a queued job to running. False if it was already taken or cleared."""
     with jobs_lock:
-        jobs[job_id]["status"]  = "running"
-        jobs[job_id]["started"] = time.time()
-        jobs[job_id]["phase"]   = "starting"
+        j = jobs.get(job_id)
+        if not j or j["status"] != "queued":
+            return False
+        j["status"]  = "running"
+        j["started"] = time.time()
+        j["phase"]   = "starting"
+        j["worker"]  = worker_id
+        if worker_id:
+            # Lease starts now so _lease_loop can't requeue it while it is prepared
+            j["lease_expires"] = time.time() + LEASE_SECONDS
         _update_queue_positions()
+    return True
 
+def _prepare_job(job_id):
+    """Check the playlist and disk before a download starts; returns the output dir."""
     data = load_data()
     pl   = data["playlists"].get(jobs[job_id]["playlist_id"])
     if not pl:
-        with jobs_lock:
-            jobs[job_id]["status"]   = "error"
-            jobs[job_id]["error"]    = "Playlist not found"
-            jobs[job_id]["finished"] = time.time()
-        return
+        _fail_job(job_id, "Playlist not found")
+        return None
+
+    if not has_free_space():
+        _fail_job(job_id, "Not enough free disk space")
+        return None
 
     out_dir = DOWNLOAD_DIR / jobs[job_id]["playlist_id"]
     out_dir.mkdir(exist_ok=True)
+    return out_dir
 
+def _run_job(job_id):
+    if not _claim_job(job_id):
+        return
+    out_dir = _prepare_job(job_id)
+    if not out_dir:
+        return
+    ok, output_file = _download_job(job_id, out_dir)
+    if ok:
+        _record_download(job_id, output_file)
+
+def _download_job(job_id, out_dir):
+    """
+    Run yt-dlp for a job, streaming progress into jobs[job_id].
+    Returns (ok, output_file); on failure the job is already marked as errored.
+    """
     with jobs_lock:
         job_snap = dict(jobs[job_id])
 
@@ -196,6 +458,7 @@ def _run_job(job_id):
             args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
             text=True, encoding="utf-8", errors="replace",
         )
+        job_procs[job_id] = proc
         for raw in proc.stdout:
             line   = raw.rstrip()
             parsed = parse_line(line)
@@ -229,42 +492,411 @@ def _run_job(job_id):
 
         if proc.returncode == 0:
             if not output_file or not Path(output_file).exists():
-                vid_id = jobs[job_id]["video_id"]
+                vid_id = job_snap["video_id"]
                 files  = sorted(out_dir.glob(f"*{vid_id}*"),
                                 key=lambda p: p.stat().st_mtime, reverse=True)
                 for f in files:
                     if f.suffix in (".mp4", ".mp3", ".webm", ".mkv", ".m4a"):
                         output_file = str(f)
                         break
-            with jobs_lock:
-                j = jobs[job_id]
-                j["status"]   = "done"; j["progress"] = 100.0
-                j["speed"]    = ""; j["eta"] = ""; j["phase"] = "done"
-                j["file"]     = output_file; j["finished"] = time.time()
-            with data_lock:
-                data = load_data()
-                pl   = data["playlists"].get(jobs[job_id]["playlist_id"])
-                if pl:
-                    for v in pl["videos"]:
-                        if v["id"] == jobs[job_id]["video_id"]:
-                            v["downloaded"] = True
-                            v["file_path"]  = output_file
-                            v["quality"]    = jobs[job_id]["quality"]
-                            v["audio_only"] = jobs[job_id]["audio_only"]
-                            break
-                    save_data(data)
-        else:
-            with jobs_lock:
-                j    = jobs[job_id]
-                hint = next((l.strip() for l in reversed(j["log"]) if l.strip()), "yt-dlp error")
-                j["status"]   = "error"; j["error"]    = hint
-                j["finished"] = time.time()
+            return True, output_file
+
+        with jobs_lock:
+            j    = jobs[job_id]
+            hint = next((l.strip() for l in reversed(j["log"]) if l.strip()), "yt-dlp error")
+        _fail_job(job_id, hint)
+        return False, None
 
     except Exception as e:
+        _fail_job(job_id, str(e))
+        return False, None
+    finally:
+        job_procs.pop(job_id, None)
+
+def _record_download(job_id, output_file):
+    """Mark a job done and store its file on the playlist entry."""
+    with jobs_lock:
+        j = jobs[job_id]
+        j["status"]   = "done"; j["progress"] = 100.0
+        j["speed"]    = ""; j["eta"] = ""; j["phase"] = "done"
+        j["file"]     = output_file; j["finished"] = time.time()
+        j["lease_expires"] = None
+        job_snap = dict(j)
+    with data_lock:
+        data = load_data()
+        pl   = data["playlists"].get(job_snap["playlist_id"])
+        if pl:
+            for v in pl["videos"]:
+                if v["id"] == job_snap["video_id"]:
+                    v["downloaded"] = True
+                    v["file_path"]  = output_file
+                    v["quality"]    = job_snap["quality"]
+                    v["audio_only"] = job_snap["audio_only"]
+                    v["downloaded_at"] = time.time()
+                    break
+            save_data(data)
+    enforce_quota()
+
+# ─── Remote Workers: Coordinator ──────────────────────────────────────────────
+#
+# Extra `yt_sync.py --worker URL` processes register here and lease jobs from
+# the same job_queue the local thread pool drains. A lease is renewed by every
+# heartbeat; if a worker goes quiet for LEASE_SECONDS its jobs are requeued.
+#
+# Trying it on one machine (each command from its own copy of yt_sync.py, so
+# every process gets its own YTSync/ dir):
+#   python yt_sync.py --port 7777 --threads 0            # coordinator only
+#   python yt_sync.py --worker http://127.0.0.1:7777 --name w1 \
+#       --shared-storage /path/to/coordinator/YTSync/downloads
+#   python yt_sync.py --worker http://127.0.0.1:7777 --name w2   # uploads files
+# Queue downloads from the manager UI, watch /api/jobs and /api/workers, then
+# kill a worker mid-download: within LEASE_SECONDS its job is requeued and
+# finished by the other one. A stub `yt-dlp` script on PATH that prints
+# "[download] Destination: <file>" and writes the file works for offline tests.
+
+LEASE_SECONDS      = 20
+HEARTBEAT_INTERVAL = 3
+REMOTE_FIELDS      = ("progress", "speed", "eta", "size", "phase", "log")
+
+workers = {}   # worker_id -> {"id", "name", "threads", "registered", "last_seen", "alive"}
+
+def register_worker(name, threads):
+    worker_id = str(uuid.uuid4())[:8]
+    now = time.time()
+    with jobs_lock:
+        workers[worker_id] = {"id": worker_id, "name": name or worker_id,
+                              "threads": threads, "registered": now,
+                              "last_seen": now, "alive": True}
+    print(f"[Coordinator] Worker {worker_id} registered ({name}, {threads} threads)")
+    return workers[worker_id]
+
+def lease_job(worker_id):
+    """Hand the next queued job to a remote worker, or None if the queue is empty."""
+    while True:
+        try:
+            job_id = job_queue.get_nowait()
+        except queue.Empty:
+            return None
+        job_queue.task_done()
+        if not _claim_job(job_id, worker_id):
+            continue
+        if not _prepare_job(job_id):
+            continue
         with jobs_lock:
-            jobs[job_id]["status"]   = "error"
-            jobs[job_id]["error"]    = str(e)
-            jobs[job_id]["finished"] = time.time()
+            j = jobs[job_id]
+            j["lease_expires"] = time.time() + LEASE_SECONDS
+            return dict(j, log=[])
+
+def worker_heartbeat(worker_id, reports):
+    """
+    Renew a worker's leases and copy its progress into the job dicts.
+    Returns the ids of jobs the worker no longer holds, or None if it is unknown.
+    """
+    now = time.time()
+    with jobs_lock:
+        w = workers.get(worker_id)
+        if not w:
+            return None
+        w["last_seen"] = now
+        w["alive"]     = True
+        lost = []
+        for rep in reports:
+            j = jobs.get(rep.get("id"))
+            if not j or j["worker"] != worker_id or j["status"] != "running":
+                lost.append(rep.get("id"))
+                continue
+            j["lease_expires"] = now + LEASE_SECONDS
+            for k in REMOTE_FIELDS:
+                if k in rep:
+                    j[k] = rep[k]
+    return lost
+
+def complete_remote_job(worker_id, job_id, ok, name, error):
+    """
+    Finish a leased job. Workers report the file name inside the playlist's
+    download dir; it must exist on this machine before the video is marked
+    downloaded. False if the job is not leased to this worker.
+    """
+    with jobs_lock:
+        j = jobs.get(job_id)
+        if not j or j["worker"] != worker_id or j["status"] != "running":
+            return False
+        pl_id = j["playlist_id"]
+    if not ok:
+        _fail_job(job_id, error or "Worker error")
+        return True
+    fpath = DOWNLOAD_DIR / pl_id / Path(name).name if name else None
+    if not fpath or not fpath.is_file():
+        _fail_job(job_id, f"Worker's file not found on coordinator: {name or '(none)'}")
+        return True
+    _record_download(job_id, str(fpath))
+    return True
+
+def expire_leases():
+    """Requeue remote jobs whose lease ran out; returns their ids."""
+    now, expired = time.time(), []
+    with jobs_lock:
+        for w in workers.values():
+            w["alive"] = now - w["last_seen"] < LEASE_SECONDS
+        for j in jobs.values():
+            if (j["worker"] and j["status"] == "running"
+                    and (j["lease_expires"] or 0) < now):
+                j["log"].append(f"[coordinator] Lease expired on worker {j['worker']}, requeued")
+                j.update(status="queued", phase="queued", worker=None,
+                         lease_expires=None, started=None, progress=0.0,
+                         speed="", eta="", size="")
+                expired.append(j["id"])
+        if expired:
+            _update_queue_positions()
+    for job_id in expired:
+        print(f"[Coordinator] Requeued job {job_id} (lease expired)")
+        job_queue.put(job_id)
+    return expired
+
+def _lease_loop():
+    while True:
+        time.sleep(HEARTBEAT_INTERVAL)
+        expire_leases()
+
+def start_coordinator():
+    threading.Thread(target=_lease_loop, daemon=True).start()
+
+# ─── Remote Workers: Worker Mode ──────────────────────────────────────────────
+
+def _remote(base, path, obj=None, timeout=30):
+    req = urllib.request.Request(
+        base.rstrip("/") + path, data=json.dumps(obj or {}).encode("utf-8"),
+        headers={"Content-Type": "application/json"}, method="POST",
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            return json.load(r)
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read() or b"{}")
+
+def _upload_file(base, worker_id, job_id, fpath):
+    qs = urlencode({"worker_id": worker_id, "job_id": job_id, "name": fpath.name})
+    with open(fpath, "rb") as f:
+        req = urllib.request.Request(
+            f"{base.rstrip('/')}/api/workers/upload?{qs}", data=f, method="POST",
+            headers={"Content-Type": "application/octet-stream",
+                     "Content-Length": str(fpath.stat().st_size)},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=300) as r:
+                resp = json.load(r)
+        except urllib.error.HTTPError as e:
+            resp = json.loads(e.read() or b"{}")
+    if "file" not in resp:
+        raise RuntimeError(resp.get("error", "Upload failed"))
+    return resp["file"]
+
+def run_worker(coordinator, threads, name, shared_storage):
+    """
+    Pull jobs from a coordinator and run them with this host's bandwidth.
+    shared_storage is this host's mount point of the coordinator's download
+    dir; files are written there directly. Without it the worker downloads
+    to a temp dir and uploads the result.
+    """
+    if shared_storage:
+        shared_storage = Path(shared_storage)
+        if not shared_storage.is_dir():
+            raise SystemExit(f"Shared storage dir not found: {shared_storage}")
+    state    = {"id": None}
+    reg_lock = threading.Lock()
+
+    def register(stale_id=None):
+        with reg_lock:
+            if state["id"] != stale_id:
+                return                          # another slot already re-registered
+            while True:
+                try:
+                    state["id"] = _remote(coordinator, "/api/workers/register",
+                                          {"name": name, "threads": threads})["id"]
+                    print(f"[Worker] Registered with {coordinator} as {state['id']}")
+                    return
+                except Exception as e:
+                    print(f"[Worker] Coordinator unreachable ({e}), retrying…")
+                    time.sleep(5)
+
+    def drop(job_id):
+        proc = job_procs.get(job_id)
+        if proc:
+            proc.kill()
+        print(f"[Worker] Lost lease on job {job_id}")
+
+    def heartbeat_loop():
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            worker_id = state["id"]
+            with jobs_lock:
+                reports = [dict({k: j[k] for k in REMOTE_FIELDS}, id=j["id"])
+                           for j in jobs.values() if j["status"] == "running"]
+            try:
+                r = _remote(coordinator, "/api/workers/heartbeat",
+                            {"worker_id": worker_id, "jobs": reports})
+            except Exception as e:
+                print(f"[Worker] Heartbeat failed: {e}")
+                continue
+            if "lost" not in r:
+                # Coordinator restarted and forgot us: its queue no longer has these jobs
+                for rep in reports:
+                    drop(rep["id"])
+                register(worker_id)
+                continue
+            for job_id in r["lost"]:
+                drop(job_id)
+
+    def run_one(job):
+        job_id    = job["id"]
+        worker_id = state["id"]
+        out_dir   = (shared_storage / job["playlist_id"] if shared_storage
+                     else Path(tempfile.mkdtemp(prefix=f"ytsync-{job_id}-")))
+        with jobs_lock:
+            jobs[job_id] = dict(job, status="running", log=[])
+        result = {"worker_id": worker_id, "job_id": job_id}
+        try:
+            out_dir.mkdir(exist_ok=True)
+            ok, output_file = _download_job(job_id, out_dir)
+            if ok and output_file and not shared_storage:
+                output_file = _upload_file(coordinator, worker_id, job_id, Path(output_file))
+            with jobs_lock:
+                # Only the name is sent; the coordinator resolves it in its own dir
+                result.update(ok=ok, file=Path(output_file).name if output_file else None,
+                              error=jobs[job_id]["error"])
+        except Exception as e:
+            result.update(ok=False, file=None, error=str(e))
+        finally:
+            with jobs_lock:
+                jobs.pop(job_id, None)
+            if not shared_storage:
+                shutil.rmtree(out_dir, ignore_errors=True)
+        try:
+            r = _remote(coordinator, "/api/workers/complete", result)
+        except Exception as e:
+            print(f"[Worker] Could not report job {job_id}: {e}")
+            return
+        if not r.get("ok"):
+            print(f"[Worker] Coordinator rejected result for job {job_id}: "
+                  f"{r.get('error', 'unknown error')}")
+            return
+        print(f"[Worker] Job {job_id} {'done' if result['ok'] else 'failed'}")
+
+    def slot():
+        while True:
+            worker_id = state["id"]
+            try:
+                r = _remote(coordinator, "/api/workers/lease", {"worker_id": worker_id})
+            except Exception as e:
+                print(f"[Worker] Lease request failed: {e}")
+                time.sleep(5)
+                continue
+            if r.get("job"):
+                run_one(r["job"])
+            elif r.get("error") == "Unknown worker":
+                register(worker_id)
+            else:
+                time.sleep(2)
+
+    register()
+    threading.Thread(target=heartbeat_loop, daemon=True).start()
+    for _ in range(threads):
+        threading.Thread(target=slot, daemon=True).start()
+    while True:
+        time.sleep(3600)
+
+# ─── Read-ahead Cache ─────────────────────────────────────────────────────────
+#
+# The player announces its next few tracks. Their files are hinted to the OS
+# page cache and their first READAHEAD_BYTES are kept in a small LRU, so the
+# first /api/stream request of the next track never waits on a cold disk.
+
+READAHEAD_BYTES     = 4 * 1024 * 1024    # cached head of each upcoming file
+READAHEAD_HINT      = 32 * 1024 * 1024   # span passed to posix_fadvise
+READAHEAD_MAX_FILES = 4
+
+head_cache  = OrderedDict()   # path -> (size, mtime, head bytes)
+cache_lock  = threading.Lock()
+cache_stats = {"hits": 0, "misses": 0, "warmed": 0,
+               "ttfb_hit": deque(maxlen=100), "ttfb_miss": deque(maxlen=100),
+               "gaps": deque(maxlen=100)}
+
+def warm_file(fpath):
+    """Pull the start of a file into memory and ask the OS to read ahead."""
+    try:
+        st = fpath.stat()
+    except OSError:
+        return
+    key = str(fpath)
+    with cache_lock:
+        entry = head_cache.get(key)
+        if entry and entry[:2] == (st.st_size, st.st_mtime):
+            head_cache.move_to_end(key)
+            return
+    with open(fpath, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(f.fileno(), 0, READAHEAD_HINT, os.POSIX_FADV_WILLNEED)
+            except OSError:
+                pass
+        head = f.read(READAHEAD_BYTES)
+    with cache_lock:
+        head_cache[key] = (st.st_size, st.st_mtime, head)
+        head_cache.move_to_end(key)
+        while len(head_cache) > READAHEAD_MAX_FILES:
+            head_cache.popitem(last=False)
+        cache_stats["warmed"] += 1
+
+def cached_head(fpath, st):
+    with cache_lock:
+        entry = head_cache.get(str(fpath))
+    if entry and entry[:2] == (st.st_size, st.st_mtime):
+        return entry[2]
+    return None
+
+def prefetch_tracks(pl_id, video_ids):
+    """Warm the files for a player's upcoming queue in the background."""
+    data  = load_data()
+    pl    = data["playlists"].get(pl_id) or {"videos": []}
+    by_id = {v["id"]: v for v in pl["videos"]}
+    paths = [Path(by_id[vid]["file_path"]) for vid in video_ids[:READAHEAD_MAX_FILES]
+             if vid in by_id and by_id[vid].get("file_path")]
+
+    def _warm_all():
+        for fpath in paths:
+            try:
+                warm_file(fpath)
+            except Exception as e:
+                print(f"[Read-ahead] Could not warm {fpath.name}: {e}")
+
+    threading.Thread(target=_warm_all, daemon=True).start()
+    return len(paths)
+
+def record_stream_start(hit, ttfb):
+    with cache_lock:
+        cache_stats["hits" if hit else "misses"] += 1
+        cache_stats["ttfb_hit" if hit else "ttfb_miss"].append(ttfb)
+
+def record_gap(ms):
+    with cache_lock:
+        cache_stats["gaps"].append(ms / 1000)
+
+def readahead_report():
+    def _avg_ms(xs):
+        return round(sum(xs) / len(xs) * 1000, 2) if xs else None
+    with cache_lock:
+        starts = cache_stats["hits"] + cache_stats["misses"]
+        return {
+            "hits": cache_stats["hits"], "misses": cache_stats["misses"],
+            "hit_rate": round(cache_stats["hits"] / starts, 3) if starts else None,
+            "warmed": cache_stats["warmed"],
+            "ttfb_hit_ms": _avg_ms(cache_stats["ttfb_hit"]),
+            "ttfb_miss_ms": _avg_ms(cache_stats["ttfb_miss"]),
+            "gap_ms": _avg_ms(cache_stats["gaps"]),
+            "gap_samples": len(cache_stats["gaps"]),
+            "cached_files": len(head_cache),
+            "cached_bytes": sum(len(e[2]) for e in head_cache.values()),
+        }
 
 # ─── HTTP Server ──────────────────────────────────────────────────────────────
 
@@ -308,9 +940,11 @@ class Handler(BaseHTTPRequestHandler):
 
     def _serve_file(self, fpath: Path):
         """Serve a media file with HTTP Range support for seeking."""
+        t0        = time.perf_counter()
         suffix    = fpath.suffix.lower()
         mime_type = MIME_MAP.get(suffix, mimetypes.guess_type(str(fpath))[0] or "application/octet-stream")
-        file_size = fpath.stat().st_size
+        st        = fpath.stat()
+        file_size = st.st_size
         range_hdr = self.headers.get("Range")
 
         if range_hdr:
@@ -334,27 +968,39 @@ class Handler(BaseHTTPRequestHandler):
             self.send_header("Content-Length", str(chunk))
             self.send_header("Accept-Ranges", "bytes")
             self.end_headers()
-            with open(fpath, "rb") as f:
-                f.seek(start)
-                remaining = chunk
-                while remaining:
-                    buf  = f.read(min(65536, remaining))
-                    if not buf:
-                        break
-                    self.wfile.write(buf)
-                    remaining -= len(buf)
         else:
+            start, chunk = 0, file_size
             self.send_response(200)
             self.send_header("Content-Type", mime_type)
             self.send_header("Content-Length", str(file_size))
             self.send_header("Accept-Ranges", "bytes")
             self.end_headers()
+
+        # Serve whatever the read-ahead cache holds, then continue from disk.
+        # Track starts (start == 0) feed the hit-rate and time-to-first-byte stats.
+        head      = cached_head(fpath, st)
+        remaining = chunk
+        first     = start == 0
+        if head and start < len(head):
+            view = memoryview(head)[start:start + remaining]   # no copy of the head
+            for i in range(0, len(view), 65536):
+                self.wfile.write(view[i:i + 65536])
+                if first:
+                    record_stream_start(True, time.perf_counter() - t0)
+                    first = False
+            remaining -= len(view)
+        if remaining > 0:
             with open(fpath, "rb") as f:
-                while True:
-                    buf = f.read(65536)
+                f.seek(start + chunk - remaining)
+                while remaining > 0:
+                    buf  = f.read(min(65536, remaining))
                     if not buf:
                         break
                     self.wfile.write(buf)
+                    remaining -= len(buf)
+                    if first:
+                        record_stream_start(False, time.perf_counter() - t0)
+                        first = False
 
     # ── GET ──────────────────────────────────────────────────────────────────
 
@@ -391,6 +1037,7 @@ class Handler(BaseHTTPRequestHandler):
             fpath = Path(video["file_path"])
             if not fpath.exists():
                 return self.send_json({"error": "File missing on disk"}, 404)
+            touch_played(pl_id, vid_id)
             self._serve_file(fpath)
             return
 
@@ -468,6 +1115,7 @@ class Handler(BaseHTTPRequestHandler):
                 "active_jobs":  active,
                 "queued_jobs":  queued,
                 "threads":      data.get("settings", {}).get("threads", DEFAULT_THREADS),
+                "workers":      sum(1 for w in workers.values() if w["alive"]),
             })
 
         elif path == "/api/playlists":
@@ -487,13 +1135,62 @@ class Handler(BaseHTTPRequestHandler):
         elif path == "/api/settings":
             self.send_json(load_data().get("settings", {}))
 
+        elif path == "/api/workers":
+            with jobs_lock:
+                self.send_json({"workers": list(workers.values())})
+
+        elif path == "/api/prefetch/stats":
+            self.send_json(readahead_report())
+
+        elif path == "/api/storage":
+            flush_play_times()
+            self.send_json(storage_report(load_data()))
+
         else:
             self.send_json({"error": "Not found"}, 404)
 
     # ── POST ─────────────────────────────────────────────────────────────────
 
+    def _receive_upload(self):
+        """Store a media file streamed back by a remote worker."""
+        qs        = parse_qs(urlparse(self.path).query)
+        worker_id = qs.get("worker_id", [""])[0]
+        job_id    = qs.get("job_id", [""])[0]
+        name      = Path(qs.get("name", [""])[0]).name
+        size      = int(self.headers.get("Content-Length", 0))
+        with jobs_lock:
+            j = jobs.get(job_id)
+            if not j or j["worker"] != worker_id or j["status"] != "running":
+                return self.send_json({"error": "Job not leased to this worker"}, 409)
+            pl_id = j["playlist_id"]
+        if not name:
+            return self.send_json({"error": "name required"}, 400)
+        out_dir = DOWNLOAD_DIR / pl_id
+        out_dir.mkdir(exist_ok=True)
+        dest = out_dir / name
+        tmp  = dest.with_name(dest.name + ".part")
+        remaining = size
+        try:
+            with open(tmp, "wb") as f:
+                while remaining:
+                    buf = self.rfile.read(min(65536, remaining))
+                    if not buf:
+                        break
+                    f.write(buf)
+                    remaining -= len(buf)
+            if remaining:
+                raise ConnectionError("Upload truncated")
+            tmp.replace(dest)
+        except Exception as e:
+            # A worker dying mid-upload must not leave an untracked .part behind
+            tmp.unlink(missing_ok=True)
+            return self.send_json({"error": str(e) or "Upload failed"}, 400)
+        self.send_json({"file": dest.name})
+
     def do_POST(self):
         path = urlparse(self.path).path
+        if path == "/api/workers/upload":
+            return self._receive_upload()
         body = self.read_body()
 
         if path == "/api/playlist/add":
@@ -571,6 +1268,9 @@ class Handler(BaseHTTPRequestHandler):
             self.send_json({"jobs": job_ids})
 
         elif path == "/api/settings/update":
+            error = validate_storage_settings(body)
+            if error:
+                return self.send_json({"error": error}, 400)
             with data_lock:
                 data = load_data()
                 data.setdefault("settings", {}).update(body)
@@ -599,20 +1299,97 @@ class Handler(BaseHTTPRequestHandler):
                     return self.send_json({"error": "Playlist not found"}, 404)
                 for v in pl["videos"]:
                     if v["id"] in video_ids and v.get("file_path"):
-                        try:
-                            fpath = Path(v["file_path"])
-                            if fpath.exists():
-                                fpath.unlink()
-                                deleted += 1
-                        except Exception:
-                            pass
-                        v["downloaded"] = False
-                        v["file_path"]  = None
-                        v.pop("quality", None)
-                        v.pop("audio_only", None)
+                        if _delete_video_file(v):
+                            deleted += 1
                 save_data(data)
             self.send_json({"deleted": deleted})
 
+        elif path == "/api/workers/register":
+            name    = body.get("name", "")
+            threads = body.get("threads", 1)
+            if (not isinstance(name, str) or not isinstance(threads, int)
+                    or isinstance(threads, bool) or threads < 1):
+                return self.send_json({"error": "name must be a string and threads a positive integer"}, 400)
+            self.send_json(register_worker(name, threads))
+
+        elif path == "/api/workers/lease":
+            worker_id = body.get("worker_id")
+            if not isinstance(worker_id, str):
+                return self.send_json({"error": "worker_id required"}, 400)
+            if worker_id not in workers:
+                return self.send_json({"error": "Unknown worker"}, 404)
+            self.send_json({"job": lease_job(worker_id)})
+
+        elif path == "/api/workers/heartbeat":
+            worker_id = body.get("worker_id")
+            reports   = body.get("jobs", [])
+            if (not isinstance(worker_id, str) or not isinstance(reports, list)
+                    or not all(isinstance(r, dict) and isinstance(r.get("id"), str)
+                               for r in reports)):
+                return self.send_json({"error": "worker_id and a list of job reports required"}, 400)
+            lost = worker_heartbeat(worker_id, reports)
+            if lost is None:
+                return self.send_json({"error": "Unknown worker"}, 404)
+            self.send_json({"lost": lost})
+
+        elif path == "/api/workers/complete":
+            name = body.get("file")
+            if name is not None and not isinstance(name, str):
+                return self.send_json({"error": "file must be a file name"}, 400)
+            if not isinstance(body.get("worker_id"), str) or not isinstance(body.get("job_id"), str):
+                return self.send_json({"error": "worker_id and job_id required"}, 400)
+            ok = complete_remote_job(body.get("worker_id"), body.get("job_id"),
+                                     bool(body.get("ok")), name, body.get("error"))
+            if not ok:
+                return self.send_json({"error": "Job not leased to this worker"}, 409)
+            self.send_json({"ok": True})
+
+        elif path == "/api/prefetch":
+            pl_id     = body.get("playlist_id")
+            video_ids = body.get("video_ids", [])
+            if (not pl_id or not isinstance(pl_id, str) or not isinstance(video_ids, list)
+                    or not all(isinstance(v, str) for v in video_ids)):
+                return self.send_json({"error": "playlist_id and a list of video_ids required"}, 400)
+            self.send_json({"warming": prefetch_tracks(pl_id, video_ids)})
+
+        elif path == "/api/prefetch/gap":
+            ms = body.get("ms")
+            try:
+                ms = None if isinstance(ms, bool) else float(ms)
+            except (TypeError, ValueError):
+                ms = None
+            if ms is None or not math.isfinite(ms) or ms < 0:
+                return self.send_json({"error": "ms must be a non-negative number"}, 400)
+            record_gap(ms)
+            self.send_json({"ok": True})
+
+        elif path == "/api/playlist/pin":
+            pl_id = body.get("id")
+            with data_lock:
+                data = load_data()
+                pl   = data["playlists"].get(pl_id)
+                if not pl:
+                    return self.send_json({"error": "Playlist not found"}, 404)
+                pl["pinned"] = bool(body.get("pinned", True))
+                save_data(data)
+            self.send_json({"id": pl_id, "pinned": pl["pinned"]})
+
+        elif path == "/api/storage/enforce":
+            dry_run  = bool(body.get("dry_run"))
+            settings = body.get("settings") or {}
+            if not isinstance(settings, dict):
+                return self.send_json({"error": "settings must be an object"}, 400)
+            settings = {k: v for k, v in settings.items()
+                        if k in ("quota_gb", "min_free_gb", "evict_when_low")}
+            error = validate_storage_settings(settings)
+            if error:
+                return self.send_json({"error": error}, 400)
+            if settings and not dry_run:
+                return self.send_json({"error": "settings can only be previewed with dry_run"}, 400)
+            evicted = enforce_quota(dry_run=dry_run, settings=settings)
+            self.send_json({"evicted": evicted,
+                            "freed": sum(e["bytes"] for e in evicted)})
+
         else:
             self.send_json({"error": "Not found"}, 404)
 
@@ -654,11 +1431,33 @@ def main():
     parser.add_argument("--port",    type=int, default=7777)
     parser.add_argument("--host",    default="0.0.0.0")
     parser.add_argument("--threads", type=int, default=None,
-                        help=f"Concurrent downloads (default: {DEFAULT_THREADS})")
+                        help=f"Concurrent downloads (default: {DEFAULT_THREADS}; 0 = only remote workers)")
+    parser.add_argument("--worker",  metavar="URL", default=None,
+                        help="Run as a download worker for the coordinator at URL")
+    parser.add_argument("--name",    default=socket.gethostname(),
+                        help="Worker name shown by the coordinator")
+    parser.add_argument("--shared-storage", metavar="DIR", default=None,
+                        help="Worker writes directly to the coordinator's download dir, "
+                             "mounted at DIR on this host")
     args = parser.parse_args()
 
+    if args.worker:
+        threads = args.threads or DEFAULT_THREADS
+        if not check_ytdlp():
+            print("WARNING: yt-dlp not found. Install: pip install yt-dlp")
+        print(f"YT-Sync worker '{args.name}'  ->  {args.worker}")
+        print(f"Threads:     {threads} concurrent downloads")
+        print(f"Storage:     {args.shared_storage or 'upload to coordinator'}")
+        print("Press Ctrl+C to stop.\n")
+        try:
+            run_worker(args.worker, threads, args.name, args.shared_storage)
+        except KeyboardInterrupt:
+            print("\nYT-Sync worker stopped.")
+        return
+
     data    = load_data()
-    threads = args.threads or data.get("settings", {}).get("threads", DEFAULT_THREADS)
+    threads = (args.threads if args.threads is not None
+               else data.get("settings", {}).get("threads", DEFAULT_THREADS))
 
     if not check_ytdlp():
         print("WARNING: yt-dlp not found. Install: pip install yt-dlp")
@@ -698,11 +1497,19 @@ def main():
     print("Press Ctrl+C to stop.\n")
 
     start_thread_pool(threads)
-    server = HTTPServer((args.host, args.port), Handler)
+    start_storage_manager()
+    start_coordinator()
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print("\nYT-Sync stopped.")
+    finally:
+        # Don't lose plays since the last periodic flush; eviction relies on them
+        try:
+            flush_play_times()
+        except Exception as e:
+            print(f"[Storage] Failed to flush play times: {e}")
 
 if __name__ == "__main__":
     main()